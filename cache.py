@@ -0,0 +1,94 @@
+"""
+cache.py
+Cache persistente de traduções para evitar chamadas repetidas à API.
+
+A chave é o hash MD5 do texto de origem + idioma de destino. Usa Redis quando
+a variável de ambiente REDIS_URL está definida; caso contrário cai para um
+cache local em disco (diskcache). Se nenhum dos dois estiver disponível, as
+funções viram no-ops e tudo continua funcionando sem cache.
+
+O prefixo das chaves é versionado (CACHE_VERSION) para que mudanças de
+política invalidem o cache antigo de forma limpa.
+"""
+
+import logging
+import os
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 'v1'
+
+# TTL padrão: 14 dias
+DEFAULT_TTL = 86400 * 14
+
+_backend = None
+_backend_ready = False
+
+
+def _make_key(text_hash: str, lang: str) -> str:
+    return f"translate:{CACHE_VERSION}:{text_hash}:{lang}"
+
+
+def _get_backend():
+    """Inicializa (uma única vez) o backend de cache disponível."""
+    global _backend, _backend_ready
+    if _backend_ready:
+        return _backend
+
+    _backend_ready = True
+
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url:
+        try:
+            import redis
+            _backend = redis.Redis.from_url(redis_url, decode_responses=True)
+            _backend.ping()
+            logger.debug('Cache de traduções usando Redis (%s)', redis_url)
+            return _backend
+        except Exception as e:
+            logger.warning('Redis indisponível (%s); tentando cache em disco', e)
+            _backend = None
+
+    try:
+        import diskcache
+        cache_dir = os.environ.get('TRANSLATE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tradutor_artigos'))
+        _backend = diskcache.Cache(cache_dir)
+        logger.debug('Cache de traduções usando diskcache (%s)', cache_dir)
+    except Exception as e:
+        logger.debug('Cache de traduções desativado: %s', e)
+        _backend = None
+
+    return _backend
+
+
+def get_cached(text_hash: str, lang: str) -> Optional[str]:
+    """Busca uma tradução no cache. Retorna None se não houver (ou sem backend)."""
+    backend = _get_backend()
+    if backend is None:
+        return None
+    try:
+        value = backend.get(_make_key(text_hash, lang))
+    except Exception as e:
+        logger.warning('Falha ao ler do cache: %s', e)
+        return None
+    if value is None:
+        return None
+    return value if isinstance(value, str) else value.decode('utf-8')
+
+
+def set_cached(text_hash: str, lang: str, text: str, ttl: int = DEFAULT_TTL) -> None:
+    """Grava uma tradução no cache com expiração (TTL em segundos)."""
+    backend = _get_backend()
+    if backend is None:
+        return
+    key = _make_key(text_hash, lang)
+    try:
+        # redis.Redis e diskcache.Cache têm assinaturas diferentes para TTL
+        if hasattr(backend, 'setex'):
+            backend.setex(key, ttl, text)
+        else:
+            backend.set(key, text, expire=ttl)
+    except Exception as e:
+        logger.warning('Falha ao gravar no cache: %s', e)
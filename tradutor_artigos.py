@@ -11,20 +11,232 @@ Não coloque sua chave diretamente no código. Use variáveis de ambiente.
 """
 
 import argparse
+import asyncio
+import functools
+import gzip
+import hashlib
 import logging
 import os
+import re
 import sys
 import uuid
-from typing import Optional
+import zipfile
+from typing import Iterator, Optional
 
+import httpx
+import orjson
 import requests
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from urllib3.util.retry import Retry
 from docx import Document
 
+from cache import get_cached, set_cached
+
+try:
+    # Tokenizador de frases do NLTK (requer o modelo 'punkt' baixado).
+    # Opcional — sem ele usamos uma divisão simples por pontuação.
+    from nltk.tokenize import sent_tokenize
+except ImportError:
+    sent_tokenize = None
+
+try:
+    # Cliente HTTP em Rust (Tokio): solta o GIL durante as requisições concorrentes.
+    # Opcional e opt-in: só é usado com TRANSLATE_USE_RUSTY_REQ=1, porque esse
+    # caminho não passa pelo retry/backoff nem pelo semáforo do cliente httpx.
+    import rusty_req
+except ImportError:
+    rusty_req = None
+
 
 logger = logging.getLogger(__name__)
 
+# Sessão HTTP compartilhada: reusa conexões keep-alive (evita um handshake
+# TCP+TLS por parágrafo) e re-tenta erros transitórios, incluindo 429 do Azure.
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    # allowed_methods precisa incluir POST explicitamente: o padrão do urllib3
+    # só re-tenta métodos idempotentes, e esta sessão é usada para POSTs
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {'POST'}
+    )
+))
+
+# Limite de chamadas simultâneas à API (evita estourar o rate limit do Azure)
+MAX_CONCURRENT_REQUESTS = 16
+
+# Limites do Azure Translator por requisição: até 100 elementos e 10.000 caracteres
+MAX_BATCH_ITEMS = 100
+MAX_BATCH_CHARS = 10_000
+
+# Corpos menores que isso não compensam o custo de comprimir
+GZIP_MIN_BYTES = 1024
+
+
+def _build_body(texts: list[str]) -> bytes:
+    """Monta o corpo JSON [{"text": ...}, ...] sem dicts intermediários.
+
+    O envelope é fixo — só as strings precisam de escape, delegado ao
+    orjson.dumps por item — então não há por que construir uma lista de
+    dicts por lote só para serializá-la em seguida.
+    """
+    if not texts:
+        return b'[]'
+    return b'[' + b','.join(b'{"text":' + orjson.dumps(text) + b'}' for text in texts) + b']'
+
+
+def _encode_body(texts: list[str]) -> tuple[bytes, dict[str, str]]:
+    """Serializa o corpo da requisição, comprimindo com gzip quando compensa.
+
+    Retorna os bytes prontos para envio e os cabeçalhos extras necessários
+    (Content-Encoding quando comprimido).
+    """
+    raw = _build_body(texts)
+    if len(raw) <= GZIP_MIN_BYTES:
+        return raw, {}
+    return gzip.compress(raw), {'Content-Encoding': 'gzip'}
+
+# Parágrafos sem nenhuma letra (só números, pontuação e espaços)
+_SEM_LETRAS = re.compile(r'[\W\d\s]+')
+
+# Divisão simples de frases por pontuação final, usada sem o NLTK
+_FIM_DE_FRASE = re.compile(r'(?<=[.!?])\s+')
+
+
+def _split_sentences(text: str) -> list[str]:
+    """Divide um parágrafo em frases — a unidade de cache/dedup/lote.
+
+    Frases se repetem entre documentos muito mais que parágrafos inteiros,
+    então traduzir por frase aumenta bastante a taxa de acerto do cache.
+    """
+    if sent_tokenize is not None:
+        try:
+            return sent_tokenize(text)
+        except LookupError:
+            # modelo 'punkt' não baixado; cai na divisão por pontuação
+            pass
+    return [s for s in _FIM_DE_FRASE.split(text) if s]
+
+
+def _replace_paragraph_text(para, text: str) -> None:
+    """Troca o texto de um parágrafo preservando a formatação.
+
+    O primeiro <w:t> recebe o texto traduzido (mantendo as propriedades do seu
+    run) e todos os demais são esvaziados. A limpeza percorre os mesmos nós que
+    a leitura (_paragraph_element_text), incluindo runs dentro de <w:hyperlink>
+    — para.runs cobre só os <w:r> filhos diretos e deixaria o texto original
+    dos hyperlinks sobrando ao lado da tradução.
+    """
+    t_elements = list(para._p.iter(_W_T))
+    if t_elements:
+        t_elements[0].text = text
+        for t in t_elements[1:]:
+            t.text = ''
+    else:
+        para.add_run(text)
+
+
+def _is_translatable(text: str) -> bool:
+    """Decide se um parágrafo vale uma chamada à API.
+
+    URLs, blocos de código e parágrafos puramente numéricos/pontuação são
+    copiados como estão — traduzi-los só gastaria quota.
+    """
+    if not text:
+        return False
+    if text.startswith(('http://', 'https://', '```')):
+        return False
+    if _SEM_LETRAS.fullmatch(text):
+        return False
+    return True
+
+
+# Namespace WordprocessingML usado dentro de word/document.xml
+_W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+_W_P = f'{{{_W_NS}}}p'
+_W_T = f'{{{_W_NS}}}t'
+
+
+def _paragraph_element_text(p) -> str:
+    """Texto de um elemento <w:p>, lido direto dos nós lxml.
+
+    Evita materializar wrappers Paragraph/Run do python-docx no caminho quente
+    de leitura — a travessia fica toda no C do lxml.
+    """
+    return ''.join(t.text or '' for t in p.iter(_W_T))
+
+
+def iter_docx_paragraph_texts(input_path: str) -> Iterator[str]:
+    """Itera os textos dos parágrafos de um .docx sem montar o DOM inteiro.
+
+    Lê word/document.xml em streaming com lxml.etree.iterparse e descarta cada
+    elemento após o uso, mantendo a memória O(parágrafo) em vez de O(documento)
+    — relevante para documentos grandes.
+    """
+    with zipfile.ZipFile(input_path) as zf:
+        with zf.open('word/document.xml') as stream:
+            for _, elem in etree.iterparse(stream, tag=_W_P, events=('end',)):
+                yield _paragraph_element_text(elem)
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+
+def _translate_text_uncached(text: str, target_language: str, endpoint: str, subscription_key: str, region: Optional[str] = None) -> str:
+    """Chama a API de tradução diretamente (só o cache persistente é consultado)."""
+    text_hash = hashlib.md5(text.encode()).hexdigest()
+    cached = get_cached(text_hash, target_language)
+    if cached is not None:
+        return cached
+
+    path = "/translate"
+    constructed_url = endpoint.rstrip("/") + path
+
+    headers = {
+        'Ocp-Apim-Subscription-Key': subscription_key,
+        'Content-type': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
+        'X-ClientTraceId': str(uuid.uuid4())
+    }
+    if region:
+        headers['Ocp-Apim-Subscription-Region'] = region
+
+    params = {
+        'api-version': '3.0',
+        'from': 'en',
+        'to': target_language
+    }
 
-def translate_text(text: str, target_language: str, endpoint: str, subscription_key: str, region: Optional[str] = None) -> str:
+    try:
+        body_bytes, extra_headers = _encode_body([text])
+        headers.update(extra_headers)
+        resp = _SESSION.post(constructed_url, params=params, headers=headers, data=body_bytes, timeout=15)
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        # Estrutura: [ { 'translations': [ { 'text': '...', 'to': 'pt' } ] } ]
+        translated = data[0]['translations'][0]['text']
+        set_cached(text_hash, target_language, translated)
+        return translated
+    except requests.RequestException as e:
+        logger.error("Erro na requisição de tradução: %s", e)
+        raise
+    except (KeyError, IndexError) as e:
+        logger.error("Resposta inesperada da API: %s", e)
+        raise
+
+
+# Cache em memória por execução: chamadas repetidas com a mesma frase/idioma
+# retornam em O(1), sem nem consultar o cache persistente.
+_translate_text_cached = functools.lru_cache(maxsize=10_000)(_translate_text_uncached)
+
+
+def translate_text(text: str, target_language: str, endpoint: str, subscription_key: str, region: Optional[str] = None, use_cache: bool = True) -> str:
     """Traduz um texto usando o Azure Translator Text API.
 
     Args:
@@ -33,19 +245,62 @@ def translate_text(text: str, target_language: str, endpoint: str, subscription_
         endpoint: URL do endpoint do serviço (ex: 'https://api.cognitive.microsofttranslator.com').
         subscription_key: Chave de subscrição (defina em AZURE_TRANSLATOR_KEY).
         region: Região (defina em AZURE_TRANSLATOR_REGION, opcional dependendo da sua subscrição).
+        use_cache: Se False, ignora o cache em memória e consulta a API de novo.
 
     Returns:
         Texto traduzido.
     """
     if not text:
         return ""
+    if not use_cache:
+        return _translate_text_uncached(text, target_language, endpoint, subscription_key, region)
+    return _translate_text_cached(text, target_language, endpoint, subscription_key, region)
+
+
+def _is_retryable_http_error(e: BaseException) -> bool:
+    """Erros transitórios que valem nova tentativa (mesma lista do adapter síncrono)."""
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (429, 500, 502, 503, 504)
 
+
+def _make_async_client() -> httpx.AsyncClient:
+    """Cliente HTTP/2 para os POSTs concorrentes ao Azure Translator.
+
+    O HTTP/2 multiplexa todas as requisições simultâneas em uma única conexão
+    TCP+TLS — menos sockets e handshakes do que um pool keep-alive HTTP/1.1.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        timeout=15
+    )
+
+
+def _chunk_texts(texts: list[str]) -> list[list[str]]:
+    """Divide a lista de textos em lotes respeitando os limites da API por requisição."""
+    batches: list[list[str]] = []
+    current: list[str] = []
+    current_chars = 0
+    for text in texts:
+        if current and (len(current) >= MAX_BATCH_ITEMS or current_chars + len(text) > MAX_BATCH_CHARS):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(text)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _translate_batch_async(texts: list[str], target_language: str, endpoint: str, subscription_key: str, region: Optional[str], session: httpx.AsyncClient, semaphore: Optional[asyncio.Semaphore] = None) -> list[str]:
+    """POSTa um único lote de textos para a API e devolve as traduções na mesma ordem."""
     path = "/translate"
     constructed_url = endpoint.rstrip("/") + path
 
     headers = {
         'Ocp-Apim-Subscription-Key': subscription_key,
         'Content-type': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
         'X-ClientTraceId': str(uuid.uuid4())
     }
     if region:
@@ -57,24 +312,163 @@ def translate_text(text: str, target_language: str, endpoint: str, subscription_
         'to': target_language
     }
 
-    body = [{'text': text}]
+    body_bytes, extra_headers = _encode_body(texts)
+    headers.update(extra_headers)
+
+    async def _post() -> list[str]:
+        try:
+            # 429/5xx são re-tentados com backoff exponencial + jitter,
+            # espelhando o Retry do adapter síncrono
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception(_is_retryable_http_error),
+                wait=wait_exponential_jitter(1, 30),
+                stop=stop_after_attempt(5),
+                reraise=True
+            ):
+                with attempt:
+                    resp = await session.post(constructed_url, params=params, headers=headers, content=body_bytes)
+                    resp.raise_for_status()
+                    data = orjson.loads(resp.content)
+                    return [d['translations'][0]['text'] for d in data]
+        except httpx.HTTPError as e:
+            logger.error("Erro na requisição de tradução: %s", e)
+            raise
+        except (KeyError, IndexError) as e:
+            logger.error("Resposta inesperada da API: %s", e)
+            raise
+
+    if semaphore is None:
+        return await _post()
+    async with semaphore:
+        return await _post()
+
+
+async def _translate_batches_rusty(batches: list[list[str]], target_language: str, endpoint: str, subscription_key: str, region: Optional[str]) -> list[str]:
+    """Envia todos os lotes de uma vez via rusty-req (I/O concorrente em Tokio, fora do GIL)."""
+    constructed_url = endpoint.rstrip("/") + "/translate"
 
-    try:
-        resp = requests.post(constructed_url, params=params, headers=headers, json=body, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
-        # Estrutura: [ { 'translations': [ { 'text': '...', 'to': 'pt' } ] } ]
-        return data[0]['translations'][0]['text']
-    except requests.RequestException as e:
-        logger.error("Erro na requisição de tradução: %s", e)
-        raise
-    except (KeyError, IndexError) as e:
-        logger.error("Resposta inesperada da API: %s", e)
-        raise
+    params = {
+        'api-version': '3.0',
+        'from': 'en',
+        'to': target_language
+    }
 
+    items = []
+    for i, batch in enumerate(batches):
+        headers = {
+            'Ocp-Apim-Subscription-Key': subscription_key,
+            'Content-type': 'application/json',
+            'X-ClientTraceId': str(uuid.uuid4())
+        }
+        if region:
+            headers['Ocp-Apim-Subscription-Region'] = region
+        items.append(rusty_req.RequestItem(
+            url=constructed_url,
+            method="POST",
+            headers=headers,
+            params=params,
+            body=_build_body(batch).decode(),
+            timeout=15,
+            tag=str(i)
+        ))
+
+    responses = await rusty_req.fetch_requests(items, total_timeout=60)
+
+    # As respostas podem chegar fora de ordem; valida cada uma antes de
+    # parsear e reagrupa pelo tag
+    by_tag: dict[int, list[str]] = {}
+    for resp in responses:
+        status = resp.get('status') or resp.get('status_code')
+        body = resp.get('body')
+        if status is None or int(status) != 200 or not body:
+            raise RuntimeError(f"Lote {resp.get('tag')} falhou via rusty-req (status={status})")
+        data = orjson.loads(body)
+        by_tag[int(resp['tag'])] = [d['translations'][0]['text'] for d in data]
+    if len(by_tag) != len(batches):
+        raise RuntimeError('rusty-req não devolveu resposta para todos os lotes')
+    return [translated for i in range(len(batches)) for translated in by_tag[i]]
+
+
+async def translate_texts(texts: list[str], target_language: str, endpoint: str, subscription_key: str, region: Optional[str] = None, session: Optional[httpx.AsyncClient] = None, semaphore: Optional[asyncio.Semaphore] = None) -> list[str]:
+    """Traduz uma lista de textos em lotes (até 100 itens / 10.000 caracteres por requisição).
+
+    Os lotes são enviados em paralelo (limitados pelo semáforo) e as traduções
+    voltam na mesma ordem da lista de entrada.
 
-def translate_document(input_path: str, target_language: str, endpoint: str, subscription_key: str, region: Optional[str] = None, output_path: Optional[str] = None) -> str:
-    """Traduz um arquivo .docx inteiro (parágrafo por parágrafo) e salva uma cópia traduzida.
+    Args:
+        texts: Textos em inglês a serem traduzidos.
+        target_language: Código do idioma de destino (ex: 'pt-br').
+        endpoint: URL do endpoint do serviço.
+        subscription_key: Chave de subscrição.
+        region: Região (opcional).
+        session: httpx.AsyncClient compartilhado (HTTP/2). Se não fornecido, um é criado.
+        semaphore: Semáforo para limitar a concorrência (opcional).
+
+    Returns:
+        Lista de textos traduzidos, na ordem da entrada.
+    """
+    if not texts:
+        return []
+
+    hashes = [hashlib.md5(text.encode()).hexdigest() for text in texts]
+    results: list[Optional[str]] = [get_cached(h, target_language) for h in hashes]
+    misses = [i for i, cached in enumerate(results) if cached is None]
+    if not misses:
+        return results
+
+    pending = [texts[i] for i in misses]
+
+    async def _dispatch(sess: httpx.AsyncClient) -> list[str]:
+        batches = _chunk_texts(pending)
+
+        async def _run(index: int, batch: list[str]) -> tuple[int, list[str]]:
+            return index, await _translate_batch_async(batch, target_language, endpoint, subscription_key, region, sess, semaphore)
+
+        tasks = [asyncio.create_task(_run(i, batch)) for i, batch in enumerate(batches)]
+
+        # Consome na ordem de conclusão (progresso visível em documentos
+        # longos), mas guarda cada resultado no slot do seu lote para que a
+        # saída mantenha a ordem da entrada
+        translated_batches: list[Optional[list[str]]] = [None] * len(batches)
+        for done, future in enumerate(asyncio.as_completed(tasks), start=1):
+            index, batch_result = await future
+            translated_batches[index] = batch_result
+            logger.info('Traduzido lote %d/%d', done, len(batches))
+        return [translated for batch in translated_batches for translated in batch]
+
+    translated: Optional[list[str]] = None
+    if rusty_req is not None and os.environ.get('TRANSLATE_USE_RUSTY_REQ') == '1':
+        try:
+            translated = await _translate_batches_rusty(_chunk_texts(pending), target_language, endpoint, subscription_key, region)
+        except Exception as e:
+            logger.warning('rusty-req falhou (%s); repetindo os lotes via httpx', e)
+
+    if translated is None:
+        if session is None:
+            async with _make_async_client() as own_session:
+                translated = await _dispatch(own_session)
+        else:
+            translated = await _dispatch(session)
+
+    for i, text in zip(misses, translated):
+        results[i] = text
+        set_cached(hashes[i], target_language, text)
+    return results
+
+
+async def translate_text_async(text: str, target_language: str, endpoint: str, subscription_key: str, region: Optional[str] = None, session: Optional[httpx.AsyncClient] = None, semaphore: Optional[asyncio.Semaphore] = None) -> str:
+    """Versão assíncrona de translate_text, para traduzir um único texto.
+
+    Para vários parágrafos prefira translate_texts, que agrupa em lotes.
+    """
+    if not text:
+        return ""
+    results = await translate_texts([text], target_language, endpoint, subscription_key, region, session=session, semaphore=semaphore)
+    return results[0]
+
+
+async def translate_document(input_path: str, target_language: str, endpoint: str, subscription_key: str, region: Optional[str] = None, output_path: Optional[str] = None) -> str:
+    """Traduz um arquivo .docx inteiro (frases em paralelo, preservando a formatação) e salva uma cópia traduzida.
 
     Args:
         input_path: Caminho para o arquivo .docx de entrada.
@@ -90,18 +484,42 @@ def translate_document(input_path: str, target_language: str, endpoint: str, sub
     if not os.path.isfile(input_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {input_path}")
 
+    # O documento é modificado no lugar (e salvo como cópia) para preservar
+    # estilos de parágrafo e formatação de runs
     doc = Document(input_path)
 
-    translated_doc = Document()
-
-    for para in doc.paragraphs:
-        text = para.text.strip()
-        if not text:
-            # Mantém quebras/linhas vazias
-            translated_doc.add_paragraph("")
+    # Unidade atômica de tradução: a frase. Cada frase única é traduzida uma
+    # vez só; URLs, código e parágrafos só-numéricos nem entram na fila.
+    # A leitura anda direto nos elementos <w:p> (filhos do body, o mesmo
+    # conjunto de doc.paragraphs) sem criar wrappers do python-docx — eles só
+    # são construídos no write-back, que precisa dos estilos.
+    paragraph_sentences: list[Optional[list[str]]] = []
+    unique: dict[str, int] = {}
+    for p in doc.element.body.findall(_W_P):
+        text = _paragraph_element_text(p).strip()
+        if not _is_translatable(text):
+            paragraph_sentences.append(None)
+            continue
+        sentences = _split_sentences(text)
+        paragraph_sentences.append(sentences)
+        for sentence in sentences:
+            if sentence not in unique:
+                unique[sentence] = len(unique)
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with _make_async_client() as session:
+        translations = await translate_texts(
+            list(unique),
+            target_language, endpoint, subscription_key, region,
+            session=session, semaphore=semaphore
+        )
+
+    # Reescreve cada parágrafo traduzido mantendo a formatação original;
+    # os demais (vazios, URLs, código) ficam intactos
+    for para, sentences in zip(doc.paragraphs, paragraph_sentences):
+        if sentences is None:
             continue
-        translated = translate_text(text, target_language, endpoint, subscription_key, region)
-        translated_doc.add_paragraph(translated)
+        _replace_paragraph_text(para, ' '.join(translations[unique[s]] for s in sentences))
 
     if output_path:
         out_path = output_path
@@ -109,7 +527,7 @@ def translate_document(input_path: str, target_language: str, endpoint: str, sub
         base, ext = os.path.splitext(input_path)
         out_path = f"{base}_{target_language}{ext}"
 
-    translated_doc.save(out_path)
+    doc.save(out_path)
     return out_path
 
 
@@ -135,7 +553,7 @@ def main(argv):
         sys.exit(1)
 
     try:
-        out = translate_document(args.input, args.to, args.endpoint, args.key, args.region, args.output)
+        out = asyncio.run(translate_document(args.input, args.to, args.endpoint, args.key, args.region, args.output))
         logger.info('Arquivo traduzido salvo em: %s', out)
     except Exception as e:
         logger.error('Falha ao traduzir: %s', e)
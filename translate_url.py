@@ -4,50 +4,132 @@ Script para extrair texto de uma URL e traduzi-lo usando Azure OpenAI via langch
 
 Uso:
   - Configure variáveis de ambiente: AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY, AZURE_OPENAI_DEPLOYMENT, AZURE_OPENAI_API_VERSION (opcional)
+  - Opcional: AZURE_OPENAI_FALLBACK_ENDPOINT/_KEY/_DEPLOYMENT para um endpoint secundário usado quando o primário devolve 429
   - Instale dependências: pip install -r requirements.txt
   - Execute: python translate_url.py -u "https://exemplo.com/artigo" --to pt-br
+  - Várias URLs podem ser passadas de uma vez; download, parse e tradução rodam em pipeline
 
 Observação:
   - Não coloque chaves no repositório; use variáveis de ambiente.
-  - Para artigos muito longos, o script pode precisar ser dividido em blocos para evitar limites da API.
+  - Artigos longos são divididos em blocos automaticamente e traduzidos em paralelo.
 """
 
 import argparse
+import asyncio
 import logging
 import os
+import re
 import sys
+from typing import Optional
 from urllib.parse import urlparse
 
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from langchain_openai import AzureChatOpenAI
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from openai import RateLimitError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+try:
+    # Parser HTML em C (Lexbor), ~20-50x mais rápido que o html.parser puro-Python.
+    # Opcional — sem ele caímos no BeautifulSoup.
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
 
 
 logger = logging.getLogger(__name__)
 
+# Tamanho dos blocos enviados ao LLM (caracteres) e sobreposição entre blocos
+CHUNK_SIZE = 3000
+CHUNK_OVERLAP = 200
+
+# Limite de chamadas simultâneas ao LLM (ajuste ao TPM/RPM do deployment)
+MAX_CONCURRENT_LLM_CALLS = 8
+
+# Limite de downloads simultâneos quando várias URLs são passadas
+MAX_CONCURRENT_FETCHES = 8
+
+# Colapsa sequências de espaços/tabs e quebras de linha (com espaços em volta)
+# em uma única quebra, numa só passada em C
+_WS = re.compile(r'[ \t]{2,}|\s*\n\s*')
+
+# Sessão HTTP compartilhada com pool de conexões e retry para erros transitórios
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+
+def _parse_html(html: str) -> str:
+    """Extrai e limpa o texto de um HTML já baixado (etapa de CPU)."""
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        for tag in tree.css('script,style,noscript'):
+            tag.decompose()
+        text = tree.body.text(separator=' ') if tree.body is not None else ''
+    else:
+        soup = BeautifulSoup(html, 'html.parser')
+        for script_or_style in soup(['script', 'style', 'noscript']):
+            script_or_style.decompose()
+        text = soup.get_text(separator=' ')
+
+    # Limpeza básica: remove múltiplos espaços e quebras desnecessárias
+    texto_limpo = _WS.sub('\n', text).strip()
+
+    return texto_limpo
+
 
 def extract_text_from_url(url: str) -> str:
     """Extrai e limpa texto de uma página web."""
-    resp = requests.get(url, timeout=15)
+    resp = _SESSION.get(url, timeout=15)
     if resp.status_code != 200:
         raise RuntimeError(f"Falha ao recuperar a página. Status code: {resp.status_code}")
+    return _parse_html(resp.text)
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    for script_or_style in soup(['script', 'style', 'noscript']):
-        script_or_style.decompose()
 
-    text = soup.get_text(separator=' ')
+async def _fetch_and_extract(url: str, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> str:
+    """Baixa uma página (sob o semáforo) e extrai o texto no executor.
 
-    # Limpeza básica: remove múltiplos espaços e quebras desnecessárias
-    linhas = (line.strip() for line in text.splitlines())
-    parts = (phrase.strip() for line in linhas for phrase in line.split('  '))
-    texto_limpo = '\n'.join(part for part in parts if part)
+    O parse roda fora do event loop, então o parsing de uma página se sobrepõe
+    ao download das outras.
+    """
+    async with semaphore:
+        logger.info('Extraindo texto de %s', url)
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"Falha ao recuperar a página. Status code: {resp.status}")
+            html = await resp.text()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _parse_html, html)
 
-    return texto_limpo
 
+async def extract_texts_from_urls(urls: list[str], session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> list[str]:
+    """Extrai o texto de várias URLs em paralelo.
+
+    Args:
+        urls: URLs das páginas.
+        session: aiohttp.ClientSession compartilhada.
+        semaphore: Limita os downloads simultâneos.
 
-def translate_article(text: str, target_language: str, azure_endpoint: str, azure_key: str, deployment: str, api_version: str = '2023-05-15') -> str:
-    """Envia o texto para o Azure OpenAI (via langchain_openai) pedindo a tradução."""
+    Returns:
+        Lista de textos extraídos, na ordem das URLs de entrada.
+    """
+    return await asyncio.gather(*[_fetch_and_extract(url, session, semaphore) for url in urls])
+
+
+async def translate_article(text: str, target_language: str, azure_endpoint: str, azure_key: str, deployment: str, api_version: str = '2023-05-15', semaphore: Optional[asyncio.Semaphore] = None) -> str:
+    """Envia o texto para o Azure OpenAI (via langchain_openai) pedindo a tradução.
+
+    Textos longos são divididos em blocos (com sobreposição) respeitando limites
+    de prompt, e os blocos são traduzidos em paralelo sob um semáforo — passe um
+    semáforo compartilhado para limitar a concorrência entre vários artigos.
+    """
     if not azure_endpoint or not azure_key or not deployment:
         raise RuntimeError('Faltam configurações do Azure OpenAI (endpoint, key ou deployment).')
 
@@ -59,22 +141,96 @@ def translate_article(text: str, target_language: str, azure_endpoint: str, azur
         max_retries=0
     )
 
+    fallback = _make_fallback_client(api_version)
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunks = splitter.split_text(text)
+
     system_prompt = "Você atua como tradutor de textos. Responda apenas com o conteúdo traduzido em Markdown."
-    user_prompt = f"Traduza o texto abaixo para {target_language} e responda em Markdown.\n\n{text}"
 
-    messages = [
-        ("system", system_prompt),
-        ("user", user_prompt)
-    ]
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+    async def _invoke_with_retry(chat_client: AzureChatOpenAI, messages) -> str:
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception_type(RateLimitError),
+            wait=wait_exponential_jitter(1, 30),
+            stop=stop_after_attempt(5),
+            reraise=True
+        ):
+            with attempt:
+                response = await chat_client.ainvoke(messages)
+                # response.content costuma ter o texto da resposta
+                return response.content
+
+    async def _translate_chunk(chunk: str) -> str:
+        messages = [
+            ("system", system_prompt),
+            ("user", f"Traduza o texto abaixo para {target_language} e responda em Markdown.\n\n{chunk}")
+        ]
+        async with semaphore:
+            try:
+                return await _invoke_with_retry(client, messages)
+            except RateLimitError:
+                if fallback is None:
+                    raise
+                # Primário saturado (429s persistentes): transborda para o
+                # endpoint secundário em vez de abortar o artigo inteiro
+                logger.warning('Limite de requisições no endpoint primário; usando o fallback')
+                return await _invoke_with_retry(fallback, messages)
 
     try:
-        response = client.invoke(messages)
-        # response.content costuma ter o texto da resposta
-        return response.content
+        parts = await asyncio.gather(*[_translate_chunk(chunk) for chunk in chunks])
     except Exception as e:
         logger.error('Erro durante a chamada ao Azure OpenAI: %s', e)
         raise
 
+    return '\n\n'.join(parts)
+
+
+async def translate_urls(urls: list[str], target_language: str, azure_endpoint: str, azure_key: str, deployment: str, api_version: str = '2023-05-15') -> list[str]:
+    """Traduz vários URLs como um pipeline: download → parse → LLM.
+
+    Cada URL flui pelas três etapas de forma independente; enquanto um artigo
+    espera o LLM, outro está sendo baixado e um terceiro sendo parseado. O
+    download usa aiohttp sob um semáforo próprio, o parse (CPU) roda no
+    executor para não bloquear o event loop, e as chamadas ao LLM dividem um
+    semáforo único entre todos os artigos.
+
+    Returns:
+        Lista de traduções em Markdown, na ordem dos URLs de entrada.
+    """
+    fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+    async with aiohttp.ClientSession() as session:
+
+        async def _process(url: str) -> str:
+            text = await _fetch_and_extract(url, session, fetch_semaphore)
+            if not text:
+                raise RuntimeError(f"Nenhum texto extraído de {url}")
+
+            logger.info('Enviando texto para tradução (Azure OpenAI): %s', url)
+            return await translate_article(text, target_language, azure_endpoint, azure_key, deployment, api_version, semaphore=llm_semaphore)
+
+        return await asyncio.gather(*[_process(url) for url in urls])
+
+
+def _make_fallback_client(api_version: str) -> Optional[AzureChatOpenAI]:
+    """Cria o cliente de transbordo (AZURE_OPENAI_FALLBACK_*), se configurado."""
+    endpoint = os.environ.get('AZURE_OPENAI_FALLBACK_ENDPOINT')
+    key = os.environ.get('AZURE_OPENAI_FALLBACK_KEY')
+    deployment = os.environ.get('AZURE_OPENAI_FALLBACK_DEPLOYMENT')
+    if not (endpoint and key and deployment):
+        return None
+    return AzureChatOpenAI(
+        azure_endpoint=endpoint,
+        api_key=key,
+        api_version=os.environ.get('AZURE_OPENAI_FALLBACK_API_VERSION', api_version),
+        deployment_name=deployment,
+        max_retries=0
+    )
+
 
 def filename_from_url(url: str, lang: str) -> str:
     parsed = urlparse(url)
@@ -85,13 +241,13 @@ def filename_from_url(url: str, lang: str) -> str:
 
 def main(argv):
     parser = argparse.ArgumentParser(description='Extrai texto de URL e traduz usando Azure OpenAI')
-    parser.add_argument('-u', '--url', required=True, help='URL do artigo a ser traduzido')
+    parser.add_argument('-u', '--url', required=True, nargs='+', help='URL(s) dos artigos a serem traduzidos')
     parser.add_argument('-t', '--to', default='pt-br', help='Idioma destino (ex: pt-br)')
     parser.add_argument('--endpoint', default=os.environ.get('AZURE_OPENAI_ENDPOINT'), help='Azure OpenAI endpoint (ou use AZURE_OPENAI_ENDPOINT)')
     parser.add_argument('--key', default=os.environ.get('AZURE_OPENAI_KEY'), help='Azure OpenAI key (ou use AZURE_OPENAI_KEY)')
     parser.add_argument('--deployment', default=os.environ.get('AZURE_OPENAI_DEPLOYMENT'), help='Deployment name (ou use AZURE_OPENAI_DEPLOYMENT)')
     parser.add_argument('--api-version', default=os.environ.get('AZURE_OPENAI_API_VERSION', '2023-05-15'))
-    parser.add_argument('-o', '--output', help='Arquivo de saída opcional (ex: artigo_pt-br.md)')
+    parser.add_argument('-o', '--output', help='Arquivo de saída opcional (ex: artigo_pt-br.md); só vale para uma única URL')
     parser.add_argument('--verbose', action='store_true', help='Ativa logs detalhados')
 
     args = parser.parse_args(argv)
@@ -99,21 +255,18 @@ def main(argv):
     logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format='%(levelname)s: %(message)s')
 
     try:
-        logger.info('Extraindo texto de %s', args.url)
-        text = extract_text_from_url(args.url)
-        if not text:
-            logger.error('Nenhum texto extraído da URL')
-            sys.exit(1)
-
-        logger.info('Enviando texto para tradução (Azure OpenAI)')
-        translated = translate_article(text, args.to, args.endpoint, args.key, args.deployment, args.api_version)
+        translations = asyncio.run(translate_urls(args.url, args.to, args.endpoint, args.key, args.deployment, args.api_version))
 
-        out_path = args.output or filename_from_url(args.url, args.to)
-        with open(out_path, 'w', encoding='utf-8') as f:
-            f.write(translated)
+        for url, translated in zip(args.url, translations):
+            if args.output and len(args.url) == 1:
+                out_path = args.output
+            else:
+                out_path = filename_from_url(url, args.to)
+            with open(out_path, 'w', encoding='utf-8') as f:
+                f.write(translated)
 
-        logger.info('Tradução salva em: %s', out_path)
-        print(out_path)
+            logger.info('Tradução salva em: %s', out_path)
+            print(out_path)
     except Exception as e:
         logger.error('Erro: %s', e)
         sys.exit(1)